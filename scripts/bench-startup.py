@@ -0,0 +1,53 @@
+"""Startup-latency guard for the wpdrive CLI.
+
+Imports wpdrive.cli in fresh interpreters, reports the median wall time and fails if
+a heavy module (requests and friends) is loaded eagerly or the median exceeds the budget.
+
+    python scripts/bench-startup.py [--runs 15] [--budget-ms 150]
+"""
+from __future__ import annotations
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+HEAVY = ["requests", "urllib3", "ssl", "wpdrive.sync_engine", "wpdrive.api", "wpdrive.daemon"]
+
+PROBE = (
+    "import json, sys, time\n"
+    "t = time.perf_counter()\n"
+    "import wpdrive.cli\n"
+    "dt = time.perf_counter() - t\n"
+    "print(json.dumps({'ms': dt * 1000, 'loaded': [m for m in %r if m in sys.modules]}))\n"
+) % (HEAVY,)
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--runs", type=int, default=15)
+    p.add_argument("--budget-ms", type=float, default=150.0, help="Max median import time of wpdrive.cli")
+    args = p.parse_args()
+
+    repo = Path(__file__).resolve().parent.parent
+    samples = []
+    loaded = set()
+    for _ in range(max(1, args.runs)):
+        out = subprocess.run([sys.executable, "-c", PROBE], cwd=repo, check=True, capture_output=True, text=True)
+        res = json.loads(out.stdout)
+        samples.append(res["ms"])
+        loaded.update(res["loaded"])
+
+    median = statistics.median(samples)
+    print(f"wpdrive.cli import: median {median:.1f} ms, min {min(samples):.1f} ms over {len(samples)} runs")
+    ok = True
+    if loaded:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(sorted(loaded))}")
+        ok = False
+    if median > args.budget_ms:
+        print(f"FAIL: median {median:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        ok = False
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
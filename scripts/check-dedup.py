@@ -0,0 +1,139 @@
+"""Offline check of content-addressed deduplication against a local stand-in server.
+
+Runs SyncEngine against an in-memory fake of the WPDrive REST API (no network) and checks
+the content index (StateDB.find_content), server-side copies (copy_from_existing), local
+copies on pull and the fallback to regular uploads when the server has no /upload/copy route.
+
+    python scripts/check-dedup.py
+"""
+from __future__ import annotations
+import hashlib
+import shutil
+import sys
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from wpdrive.api import APIError  # noqa: E402
+from wpdrive.sync_engine import SyncEngine  # noqa: E402
+
+class FakeServer:
+    def __init__(self, copy_route: bool = True):
+        self.copy_route = copy_route
+        self.files: Dict[str, Tuple[bytes, int]] = {}
+        self.changes: List[Dict[str, Any]] = []
+        self.uploads: Dict[str, List[Any]] = {}
+        self.calls: List[Tuple[str, str]] = []
+        self.rev = 0
+
+    def put(self, rel: str, data: bytes, device_id: str, mtime: int) -> Dict[str, Any]:
+        self.rev += 1
+        self.files[rel] = (data, self.rev)
+        self.changes.append({
+            "change_id": len(self.changes) + 1,
+            "action": "upsert",
+            "rel_path": rel,
+            "device_id": device_id,
+            "rev": self.rev,
+            "size": len(data),
+            "mtime": mtime,
+            "crc32": zlib.crc32(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        })
+        return {"rel_path": rel, "rev": self.rev}
+
+class FakeAPI:
+    # Same method surface as WPDriveAPI, backed by a FakeServer.
+    def __init__(self, srv: FakeServer):
+        self.srv = srv
+
+    def changes(self, since: int, limit: int = 500, prefixes: Optional[List[str]] = None) -> Dict[str, Any]:
+        return {"changes": [c for c in self.srv.changes if c["change_id"] > since][:limit]}
+
+    def upload_init(self, rel_path: str, size: int, mtime: int, crc32: int, base_rev: int, device_id: str, device_label: str, sha256: Optional[str] = None) -> Dict[str, Any]:
+        self.srv.calls.append(("upload", rel_path))
+        upload_id = str(len(self.srv.uploads))
+        self.srv.uploads[upload_id] = [rel_path, b"", mtime, device_id]
+        return {"upload_id": upload_id, "decided_path": rel_path}
+
+    def upload_chunk(self, upload_id: str, offset: int, data: bytes) -> Dict[str, Any]:
+        self.srv.uploads[upload_id][1] += data
+        return {}
+
+    def upload_finalize(self, upload_id: str) -> Dict[str, Any]:
+        rel, data, mtime, device_id = self.srv.uploads.pop(upload_id)
+        return self.srv.put(rel, data, device_id, mtime)
+
+    def upload_copy(self, rel_path: str, source_rel_path: str, size: int, mtime: int, crc32: int, sha256: str, base_rev: int, device_id: str, device_label: str) -> Dict[str, Any]:
+        self.srv.calls.append(("copy", rel_path))
+        if not self.srv.copy_route:
+            raise APIError(404, {"code": "rest_no_route", "message": "No route was found matching the URL and request method."})
+        data = self.srv.files[source_rel_path][0]
+        if hashlib.sha256(data).hexdigest() != sha256:
+            raise APIError(409, {"code": "wpdrive_copy_mismatch", "message": "Source content changed."})
+        return self.srv.put(rel_path, data, device_id, mtime)
+
+    def download_stream(self, rel_path: str, chunk: int = 1024 * 1024) -> Iterator[bytes]:
+        self.srv.calls.append(("download", rel_path))
+        yield self.srv.files[rel_path][0]
+
+def make_engine(root: Path, srv: FakeServer) -> SyncEngine:
+    cfg = {"root": str(root), "url": "http://wpdrive.invalid", "user": "u", "app_password": "p", "ignore": [".wpdrive/**"]}
+    engine = SyncEngine(cfg)
+    engine.api = FakeAPI(srv)
+    return engine
+
+def check(cond: bool, what: str) -> None:
+    print(("ok   " if cond else "FAIL ") + what)
+    if not cond:
+        raise SystemExit(1)
+
+def main() -> int:
+    tmp = Path(tempfile.mkdtemp(prefix="wpdrive-dedup-"))
+    try:
+        data = b"duplicate media" * 4096
+        sha = hashlib.sha256(data).hexdigest()
+
+        srv = FakeServer()
+        a = tmp / "a"
+        a.mkdir()
+        (a / "one.jpg").write_bytes(data)
+        eng = make_engine(a, srv)
+        eng.sync_once()
+        check(eng.db.find_content(len(data), sha) == "one.jpg", "content index records uploaded file")
+        check(eng.db.find_content(len(data), sha, exclude="one.jpg") is None, "find_content honours exclude")
+
+        (a / "two.jpg").write_bytes(data)
+        srv.calls.clear()
+        eng.sync_once()
+        check(srv.calls == [("copy", "two.jpg")], "duplicate uploaded as server-side copy")
+        check(srv.files["two.jpg"][0] == data, "server holds copied content")
+
+        b = tmp / "b"
+        b.mkdir()
+        srv.calls.clear()
+        make_engine(b, srv).sync_once()
+        check(srv.calls.count(("download", "one.jpg")) + srv.calls.count(("download", "two.jpg")) == 1, "pull downloads duplicate content once")
+        check((b / "two.jpg").read_bytes() == data, "pulled duplicate copied locally")
+
+        srv_old = FakeServer(copy_route=False)
+        c = tmp / "c"
+        c.mkdir()
+        (c / "one.jpg").write_bytes(data)
+        eng_old = make_engine(c, srv_old)
+        eng_old.sync_once()
+        (c / "two.jpg").write_bytes(data)
+        (c / "three.jpg").write_bytes(data)
+        srv_old.calls.clear()
+        eng_old.sync_once()
+        check(not eng_old.server_copy_supported, "missing /upload/copy route disables server copies")
+        check(srv_old.calls == [("copy", "three.jpg"), ("upload", "three.jpg"), ("upload", "two.jpg")], "falls back to regular uploads")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Dict, Iterator, Optional
+from typing import Any, Dict, Iterator, List, Optional
 import requests
 
 @dataclass
@@ -18,16 +18,17 @@ class APIError(RuntimeError):
         super().__init__(f"APIError {status_code}: {msg}")
 
 class WPDriveAPI:
-    def __init__(self, cfg: APIConfig):
+    def __init__(self, cfg: APIConfig, session: Optional[requests.Session] = None):
         self.cfg = cfg
         self.base = cfg.url.rstrip("/") + "/wp-json/wpdrive/v1"
-        self.session = requests.Session()
-        self.session.auth = (cfg.user, cfg.app_password)
+        # The session may be shared with other roots on the same host, so auth is sent per request.
+        self.session = session or requests.Session()
+        self.auth = (cfg.user, cfg.app_password)
 
     def _req(self, method: str, path: str, **kwargs) -> requests.Response:
         url = self.base + path
         timeout = kwargs.pop("timeout", self.cfg.timeout)
-        r = self.session.request(method, url, timeout=timeout, **kwargs)
+        r = self.session.request(method, url, timeout=timeout, auth=self.auth, **kwargs)
         if r.status_code >= 400:
             try:
                 data = r.json()
@@ -36,11 +37,15 @@ class WPDriveAPI:
             raise APIError(r.status_code, data)
         return r
 
-    def changes(self, since: int, limit: int = 500) -> Dict[str, Any]:
-        r = self._req("GET", "/changes", params={"since": int(since), "limit": int(limit)})
+    def changes(self, since: int, limit: int = 500, prefixes: Optional[List[str]] = None) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"since": int(since), "limit": int(limit)}
+        if prefixes:
+            # Servers that support it only return changes under these path prefixes; others ignore it.
+            params["prefix[]"] = list(prefixes)
+        r = self._req("GET", "/changes", params=params)
         return r.json()
 
-    def upload_init(self, rel_path: str, size: int, mtime: int, crc32: int, base_rev: int, device_id: str, device_label: str) -> Dict[str, Any]:
+    def upload_init(self, rel_path: str, size: int, mtime: int, crc32: int, base_rev: int, device_id: str, device_label: str, sha256: Optional[str] = None) -> Dict[str, Any]:
         payload = {
             "rel_path": rel_path,
             "size": int(size),
@@ -50,9 +55,27 @@ class WPDriveAPI:
             "device_id": device_id,
             "device_label": device_label,
         }
+        if sha256:
+            payload["sha256"] = sha256
         r = self._req("POST", "/upload/init", json=payload)
         return r.json()
 
+    def upload_copy(self, rel_path: str, source_rel_path: str, size: int, mtime: int, crc32: int, sha256: str, base_rev: int, device_id: str, device_label: str) -> Dict[str, Any]:
+        # Server-side copy of content it already stores; response has the same shape as upload_finalize.
+        payload = {
+            "rel_path": rel_path,
+            "source_rel_path": source_rel_path,
+            "size": int(size),
+            "mtime": int(mtime),
+            "crc32": str(int(crc32)),
+            "sha256": sha256,
+            "base_rev": int(base_rev),
+            "device_id": device_id,
+            "device_label": device_label,
+        }
+        r = self._req("POST", "/upload/copy", json=payload)
+        return r.json()
+
     def upload_chunk(self, upload_id: str, offset: int, data: bytes) -> Dict[str, Any]:
         r = self._req(
             "POST",
@@ -71,9 +94,25 @@ class WPDriveAPI:
         r = self._req("POST", "/delete", json={"rel_path": rel_path, "device_id": device_id})
         return r.json()
 
+    def delete_batch(self, rel_paths: List[str], device_id: str) -> Dict[str, Any]:
+        r = self._req("POST", "/delete/batch", json={"rel_paths": list(rel_paths), "device_id": device_id})
+        return r.json()
+
+    def move(self, from_rel_path: str, to_rel_path: str, base_rev: int, device_id: str, device_label: str) -> Dict[str, Any]:
+        # Server-side rename; response has the same shape as upload_finalize.
+        payload = {
+            "from_rel_path": from_rel_path,
+            "to_rel_path": to_rel_path,
+            "base_rev": int(base_rev),
+            "device_id": device_id,
+            "device_label": device_label,
+        }
+        r = self._req("POST", "/move", json=payload)
+        return r.json()
+
     def download_stream(self, rel_path: str, chunk: int = 1024 * 1024) -> Iterator[bytes]:
         url = self.base + "/download"
-        r = self.session.get(url, params={"path": rel_path}, stream=True, timeout=self.cfg.timeout)
+        r = self.session.get(url, params={"path": rel_path}, stream=True, timeout=self.cfg.timeout, auth=self.auth)
         if r.status_code >= 400:
             try:
                 data = r.json()
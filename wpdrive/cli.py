@@ -4,7 +4,9 @@ import sys
 from pathlib import Path
 from typing import Optional
 
-from .sync_engine import SyncEngine
+# Keep this module's imports light: sync_engine/daemon pull in requests (urllib3, ssl, ...), so
+# they are imported inside the commands that talk to the server. `init`, `status` and `--help`
+# never load them; scripts/bench-startup.py guards this.
 from .state import StateDB
 from .util import load_config, save_config, default_config, ensure_dir
 
@@ -34,6 +36,10 @@ def cmd_init(args: argparse.Namespace) -> None:
     cfg["app_password"] = args.app_password
     if args.chunk_size_mb is not None:
         cfg["chunk_size_mb"] = int(args.chunk_size_mb)
+    if args.include:
+        cfg["sync_include"] = list(args.include)
+    if args.exclude:
+        cfg["sync_exclude"] = list(args.exclude)
 
     save_config(cfg_path, cfg)
     db = StateDB(root)
@@ -42,12 +48,65 @@ def cmd_init(args: argparse.Namespace) -> None:
     print(f"Config written to {cfg_path}")
 
 def cmd_sync(args: argparse.Namespace) -> None:
+    from .sync_engine import SyncEngine
     start = Path(args.root).expanduser().resolve() if args.root else Path.cwd()
     cfg = _find_config(start)
     engine = SyncEngine(cfg)
     engine.sync_once()
 
+def cmd_status(args: argparse.Namespace) -> int:
+    # Offline, stat-only answer to "is anything pending?": no network, no hashing, no requests import.
+    from .pathfilter import PathFilter
+    from .scan import scan_files
+
+    start = Path(args.root).expanduser().resolve() if args.root else Path.cwd()
+    cfg = _find_config(start)
+    root = Path(cfg["root"]).expanduser().resolve()
+    path_filter = PathFilter(cfg.get("sync_include") or [], cfg.get("sync_exclude") or [])
+    db = StateDB(root)
+    if not db.path.exists():
+        print(f"ERROR: No state database in {db.dir}. Run `wpdrive init` first.", file=sys.stderr)
+        return 2
+
+    known = {rel: (size, mtime) for rel, size, mtime, _crc, _rev in db.iter_files()}
+    new = changed = 0
+    for rel, absp in scan_files(root, cfg.get("ignore") or [".wpdrive/**"], path_filter).items():
+        st = absp.stat()
+        state = known.pop(rel, None)
+        if state is None:
+            new += 1
+        elif state != (int(st.st_size), int(st.st_mtime)):
+            changed += 1
+    deleted = sum(1 for rel in known if path_filter.allows(rel))
+
+    print(f"root: {root}")
+    print(f"last change id: {db.get_last_change_id()}")
+    pending = new + changed + deleted
+    if not pending:
+        print("local changes: none")
+        return 0
+    print(f"local changes: {new} new, {changed} modified, {deleted} deleted")
+    return 1
+
 def cmd_daemon(args: argparse.Namespace) -> None:
+    from .daemon import MultiRootDaemon, load_daemon_config, load_root_configs
+    from .sync_engine import SyncEngine
+    if args.config:
+        try:
+            dcfg = load_daemon_config(Path(args.config).expanduser())
+            cfgs = load_root_configs(dcfg["roots"])
+        except RuntimeError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            raise SystemExit(2)
+        daemon = MultiRootDaemon(
+            cfgs,
+            interval=int(dcfg.get("interval") or args.interval),
+            max_transfers=int(dcfg.get("max_transfers") or 2),
+            hash_workers=int(dcfg.get("hash_workers") or 0),
+            max_concurrent_roots=int(dcfg.get("max_concurrent_roots") or 4),
+        )
+        daemon.run()
+        return
     start = Path(args.root).expanduser().resolve() if args.root else Path.cwd()
     cfg = _find_config(start)
     engine = SyncEngine(cfg)
@@ -63,20 +122,26 @@ def main() -> int:
     p_init.add_argument("--user", required=True, help="WordPress username for sync (role WPDrive Sync recommended)")
     p_init.add_argument("--app-password", required=True, help="WordPress Application Password")
     p_init.add_argument("--chunk-size-mb", type=int, default=None, help="Preferred chunk size in MB (default 32)")
+    p_init.add_argument("--include", action="append", default=None, metavar="PREFIX", help="Only sync paths under this prefix (repeatable)")
+    p_init.add_argument("--exclude", action="append", default=None, metavar="PREFIX", help="Never sync paths under this prefix (repeatable)")
     p_init.set_defaults(func=cmd_init)
 
     p_sync = sub.add_parser("sync", help="Run a one-shot sync")
     p_sync.add_argument("--root", default=None, help="Optional root path if not running inside the sync folder")
     p_sync.set_defaults(func=cmd_sync)
 
+    p_status = sub.add_parser("status", help="Show pending local changes without contacting the server (exit 1 if any)")
+    p_status.add_argument("--root", default=None, help="Optional root path if not running inside the sync folder")
+    p_status.set_defaults(func=cmd_status)
+
     p_daemon = sub.add_parser("daemon", help="Run continuous sync (polling)")
     p_daemon.add_argument("--root", default=None, help="Optional root path if not running inside the sync folder")
     p_daemon.add_argument("--interval", type=int, default=10, help="Polling interval seconds (default 10)")
+    p_daemon.add_argument("--config", default=None, help="Multi-root daemon config (JSON with a \"roots\" list); syncs every listed root from one process")
     p_daemon.set_defaults(func=cmd_daemon)
 
     args = p.parse_args()
-    args.func(args)
-    return 0
+    return args.func(args) or 0
 
 if __name__ == "__main__":
     raise SystemExit(main())
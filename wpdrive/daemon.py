@@ -0,0 +1,91 @@
+from __future__ import annotations
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .resources import SharedResources
+from .sync_engine import SyncEngine
+from .util import load_config
+
+def load_daemon_config(path: Path) -> Dict[str, Any]:
+    # {"roots": ["/srv/site-a", ...], "interval": 10, "max_transfers": 2, "hash_workers": 4, "max_concurrent_roots": 4}
+    with open(path, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    roots = cfg.get("roots") or []
+    if not roots:
+        raise RuntimeError(f"No roots listed in daemon config: {path}")
+    return cfg
+
+def load_root_configs(roots: List[str]) -> List[dict]:
+    # Each listed root must itself be initialized (no upward search to a parent root), and no two
+    # entries may share a root, since two engines on one state.db would race each other.
+    cfgs: List[dict] = []
+    seen: Dict[Path, str] = {}
+    for r in roots:
+        root = Path(r).expanduser().resolve()
+        cfg_path = root / ".wpdrive" / "config.json"
+        if not cfg_path.exists():
+            raise RuntimeError(f"Root is not initialized (missing {cfg_path}); run `wpdrive init --root {root}` first")
+        cfg = load_config(cfg_path)
+        cfg_root = Path(cfg["root"]).expanduser().resolve()
+        for key in {root, cfg_root}:
+            if key in seen:
+                raise RuntimeError(f"Root listed more than once in daemon config: {r} (same as {seen[key]})")
+            seen[key] = r
+        cfgs.append(cfg)
+    return cfgs
+
+class MultiRootDaemon:
+    # max_concurrent_roots roots sync at once (polling, scanning, hashing); each moves one file at a
+    # time, and at most max_transfers of them upload/download concurrently across the whole process.
+    def __init__(self, cfgs: List[dict], interval: int = 10, max_transfers: int = 2, hash_workers: int = 0, max_concurrent_roots: int = 4):
+        self.interval = max(3, int(interval))
+        self.max_concurrent_roots = max(1, int(max_concurrent_roots))
+        self.resources = SharedResources(max_transfers=min(int(max_transfers), self.max_concurrent_roots), hash_workers=hash_workers)
+        roots = [Path(cfg["root"]).expanduser().resolve() for cfg in cfgs]
+        names = [r.name or str(r) for r in roots]
+        # Label log lines by folder name, falling back to the full path when names collide.
+        labels = [name if names.count(name) == 1 else str(root) for name, root in zip(names, roots)]
+        self.engines = [SyncEngine(cfg, resources=self.resources, label=label) for cfg, label in zip(cfgs, labels)]
+
+    def run(self) -> None:
+        n = len(self.engines)
+        print(
+            f"[wpdrive] multi-root daemon: roots={n} interval={self.interval}s "
+            f"transfers={self.resources.max_transfers} concurrent_roots={self.max_concurrent_roots}"
+        )
+        # Spread first runs across one interval so roots don't all poll at once.
+        start = time.monotonic()
+        due = [start + i * self.interval / n for i in range(n)]
+        running: Dict[Future, int] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_roots, thread_name_prefix="wpdrive-root") as pool:
+            while True:
+                now = time.monotonic()
+                busy = set(running.values())
+                for i in sorted(range(n), key=lambda i: due[i]):
+                    if len(running) >= self.max_concurrent_roots:
+                        break
+                    if i not in busy and due[i] <= now:
+                        running[pool.submit(self.engines[i].sync_once)] = i
+                        busy.add(i)
+
+                if len(running) >= self.max_concurrent_roots:
+                    # No free slot: nothing can start until a running sync finishes.
+                    timeout = None
+                else:
+                    idle = [due[i] for i in range(n) if i not in busy]
+                    timeout = max(0.0, min(idle) - now) if idle else None
+                if not running:
+                    time.sleep(timeout or 0.0)
+                    continue
+
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    i = running.pop(fut)
+                    exc = fut.exception()
+                    if exc is not None:
+                        self.engines[i].log(f"ERROR: {exc}")
+                    due[i] = time.monotonic() + self.interval
@@ -0,0 +1,89 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional
+
+class _Node:
+    __slots__ = ("children", "terminal")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _Node] = {}
+        self.terminal = False
+
+def _split(path: str) -> List[str]:
+    return [seg for seg in path.strip().strip("/").split("/") if seg]
+
+def _build(prefixes: Iterable[str]) -> Optional[_Node]:
+    root: Optional[_Node] = None
+    for prefix in prefixes:
+        segs = _split(prefix)
+        if not segs:
+            continue
+        root = root or _Node()
+        node = root
+        for seg in segs:
+            node = node.children.setdefault(seg, _Node())
+        node.terminal = True
+    return root
+
+def _under(trie: Optional[_Node], segs: List[str]) -> bool:
+    # True if some prefix in the trie covers segs (segment-wise, so "a/b" covers "a/b/c" but not "a/bc").
+    node = trie
+    for seg in segs:
+        if node is None:
+            return False
+        if node.terminal:
+            return True
+        node = node.children.get(seg)
+    return node is not None and node.terminal
+
+def _above(trie: Optional[_Node], segs: List[str]) -> bool:
+    # True if segs is an ancestor directory of (or equal to) some prefix in the trie.
+    node = trie
+    for seg in segs:
+        if node is None:
+            return False
+        node = node.children.get(seg)
+    return node is not None
+
+class PathFilter:
+    # Per-device selective sync rules: rel paths must sit under an include prefix (if any are set)
+    # and not under an exclude prefix. Matching walks a segment trie, so cost is O(path depth).
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = ()):
+        self.include = sorted({"/".join(_split(p)) for p in include if _split(p)})
+        self.exclude = sorted({"/".join(_split(p)) for p in exclude if _split(p)})
+        self._include = _build(self.include)
+        self._exclude = _build(self.exclude)
+
+    @property
+    def active(self) -> bool:
+        return bool(self.include or self.exclude)
+
+    def allows(self, rel_path: str) -> bool:
+        segs = _split(rel_path)
+        if self._exclude is not None and _under(self._exclude, segs):
+            return False
+        return self._include is None or _under(self._include, segs)
+
+    def allows_dir(self, rel_dir: str) -> bool:
+        # Whether anything below rel_dir can be allowed; used to prune directory walks.
+        segs = _split(rel_dir)
+        if self._exclude is not None and _under(self._exclude, segs):
+            return False
+        return self._include is None or _under(self._include, segs) or _above(self._include, segs)
+
+    def signature(self) -> str:
+        return "\n".join(["+" + p for p in self.include] + ["-" + p for p in self.exclude])
+
+    @classmethod
+    def from_signature(cls, sig: str) -> "PathFilter":
+        lines = [line for line in sig.splitlines() if line]
+        return cls([line[1:] for line in lines if line[0] == "+"], [line[1:] for line in lines if line[0] == "-"])
+
+    def within(self, other: "PathFilter") -> bool:
+        # Conservative check that everything this filter allows is also allowed by other,
+        # i.e. switching from other to self only narrows what is synced.
+        if other._include is not None:
+            if self._include is None:
+                return False
+            if any(not _under(other._include, _split(p)) for p in self.include):
+                return False
+        return all(not self.allows_dir(p) for p in other.exclude)
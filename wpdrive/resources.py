@@ -0,0 +1,41 @@
+from __future__ import annotations
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+from urllib.parse import urlsplit
+
+from .util import hash_file
+
+class SharedResources:
+    # Process-wide pieces shared by every SyncEngine in a daemon: one HTTP connection pool per host,
+    # a global cap on concurrent transfers and a single hashing worker pool.
+    def __init__(self, max_transfers: int = 4, hash_workers: int = 0):
+        self.max_transfers = max(1, int(max_transfers))
+        self.hash_workers = int(hash_workers) or min(4, os.cpu_count() or 1)
+        self.transfer_slots = threading.BoundedSemaphore(self.max_transfers)
+        self._sessions: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._hash_pool: Any = None
+
+    def session_for(self, url: str) -> Any:
+        import requests
+        parts = urlsplit(url)
+        key = f"{parts.scheme}://{parts.netloc}".lower()
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                self._sessions[key] = session
+            return session
+
+    def hash_files(self, paths: Iterable[Path]) -> List[Tuple[int, str]]:
+        paths = list(paths)
+        if len(paths) < 2 or self.hash_workers < 2:
+            return [hash_file(p) for p in paths]
+        with self._lock:
+            if self._hash_pool is None:
+                self._hash_pool = ThreadPoolExecutor(max_workers=self.hash_workers, thread_name_prefix="wpdrive-hash")
+            pool = self._hash_pool
+        return list(pool.map(hash_file, paths))
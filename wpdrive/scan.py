@@ -2,8 +2,9 @@ from __future__ import annotations
 import fnmatch
 import os
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+from .pathfilter import PathFilter
 from .util import to_rel_posix
 
 def _matches_any(path_posix: str, patterns: List[str]) -> bool:
@@ -12,7 +13,7 @@ def _matches_any(path_posix: str, patterns: List[str]) -> bool:
             return True
     return False
 
-def scan_files(root: Path, ignore: List[str]) -> Dict[str, Path]:
+def scan_files(root: Path, ignore: List[str], path_filter: Optional[PathFilter] = None) -> Dict[str, Path]:
     files: Dict[str, Path] = {}
     root = root.resolve()
 
@@ -26,6 +27,8 @@ def scan_files(root: Path, ignore: List[str]) -> Dict[str, Path]:
             rel = to_rel_posix(root, absd)
             if _matches_any(rel + "/", ignore) or _matches_any(rel, ignore):
                 pruned.append(d)
+            elif path_filter is not None and not path_filter.allows_dir(rel):
+                pruned.append(d)
         for d in pruned:
             dirnames.remove(d)
 
@@ -34,6 +37,8 @@ def scan_files(root: Path, ignore: List[str]) -> Dict[str, Path]:
             rel = to_rel_posix(root, absp)
             if _matches_any(rel, ignore):
                 continue
+            if path_filter is not None and not path_filter.allows(rel):
+                continue
             files[rel] = absp
 
     return files
@@ -1,10 +1,89 @@
 from __future__ import annotations
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterator, Optional, Tuple
+from typing import Iterable, Iterator, Optional, Tuple
 
 from .util import ensure_dir
 
+def _set_meta(con: sqlite3.Connection, key: str, value: str) -> None:
+    con.execute(
+        "INSERT INTO meta(key,value) VALUES(?,?) "
+        "ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+        (key, value),
+    )
+
+def _upsert_file(con: sqlite3.Connection, rel_path: str, size: int, mtime: int, crc32: int, server_rev: int, sha256: Optional[str]) -> None:
+    con.execute(
+        "INSERT INTO files(rel_path,size,mtime,crc32,server_rev) VALUES(?,?,?,?,?) "
+        "ON CONFLICT(rel_path) DO UPDATE SET "
+        "size=excluded.size, mtime=excluded.mtime, crc32=excluded.crc32, server_rev=excluded.server_rev",
+        (rel_path, int(size), int(mtime), int(crc32), int(server_rev)),
+    )
+    # Content index: only keep an entry when the strong hash is known for this exact content.
+    if sha256:
+        con.execute(
+            "INSERT INTO content(rel_path,size,sha256) VALUES(?,?,?) "
+            "ON CONFLICT(rel_path) DO UPDATE SET size=excluded.size, sha256=excluded.sha256",
+            (rel_path, int(size), sha256),
+        )
+    else:
+        con.execute("DELETE FROM content WHERE rel_path=?", (rel_path,))
+
+def _delete_files(con: sqlite3.Connection, rel_paths: Iterable[str]) -> None:
+    rows = [(rel,) for rel in rel_paths]
+    con.executemany("DELETE FROM files WHERE rel_path=?", rows)
+    con.executemany("DELETE FROM content WHERE rel_path=?", rows)
+
+def _get_file(con: sqlite3.Connection, rel_path: str) -> Optional[Tuple[int, int, int, int]]:
+    cur = con.execute("SELECT size,mtime,crc32,server_rev FROM files WHERE rel_path=?", (rel_path,))
+    row = cur.fetchone()
+    return (int(row[0]), int(row[1]), int(row[2]), int(row[3])) if row else None
+
+def _find_content(con: sqlite3.Connection, size: int, sha256: str, exclude: Optional[str]) -> Optional[str]:
+    cur = con.execute(
+        "SELECT c.rel_path FROM content c JOIN files f ON f.rel_path=c.rel_path "
+        "WHERE c.size=? AND c.sha256=? AND f.size=c.size AND f.server_rev>0 AND c.rel_path<>? "
+        "ORDER BY c.rel_path LIMIT 1",
+        (int(size), sha256, exclude or ""),
+    )
+    row = cur.fetchone()
+    return row[0] if row else None
+
+class StateBatch:
+    # Groups state writes on one connection so file rows and the change cursor commit atomically.
+    # Reads go through the same connection so they see the batch's own uncommitted writes.
+    def __init__(self, con: sqlite3.Connection):
+        self.con = con
+        # True while file rows are written but not committed (the connection then holds the write lock).
+        self.pending = False
+
+    def commit(self) -> None:
+        self.con.commit()
+        self.pending = False
+
+    def set_last_change_id(self, cid: int) -> None:
+        _set_meta(self.con, "last_change_id", str(int(cid)))
+
+    def upsert_file(self, rel_path: str, size: int, mtime: int, crc32: int, server_rev: int, sha256: Optional[str] = None) -> None:
+        _upsert_file(self.con, rel_path, size, mtime, crc32, server_rev, sha256)
+        self.pending = True
+
+    def delete_file(self, rel_path: str) -> None:
+        _delete_files(self.con, [rel_path])
+        self.pending = True
+
+    def get_file(self, rel_path: str) -> Optional[Tuple[int, int, int, int]]:
+        return _get_file(self.con, rel_path)
+
+    def find_content(self, size: int, sha256: str, exclude: Optional[str] = None) -> Optional[str]:
+        return _find_content(self.con, size, sha256, exclude)
+
+    def replayed_until(self, rel_path: str) -> int:
+        cur = self.con.execute("SELECT until_change_id FROM replay_tracked WHERE rel_path=?", (rel_path,))
+        row = cur.fetchone()
+        return int(row[0]) if row else 0
+
 class StateDB:
     def __init__(self, root: Path):
         self.root = root
@@ -33,6 +112,16 @@ class StateDB:
                 " crc32 INTEGER NOT NULL,"
                 " server_rev INTEGER NOT NULL DEFAULT 0"
                 ");"
+                "CREATE TABLE IF NOT EXISTS content ("
+                " rel_path TEXT PRIMARY KEY,"
+                " size INTEGER NOT NULL,"
+                " sha256 TEXT NOT NULL"
+                ");"
+                "CREATE INDEX IF NOT EXISTS content_size_sha256 ON content(size, sha256);"
+                "CREATE TABLE IF NOT EXISTS replay_tracked ("
+                " rel_path TEXT PRIMARY KEY,"
+                " until_change_id INTEGER NOT NULL"
+                ");"
             )
             con.commit()
         finally:
@@ -50,11 +139,7 @@ class StateDB:
     def set_meta(self, key: str, value: str) -> None:
         con = self.connect()
         try:
-            con.execute(
-                "INSERT INTO meta(key,value) VALUES(?,?) "
-                "ON CONFLICT(key) DO UPDATE SET value=excluded.value",
-                (key, value),
-            )
+            _set_meta(con, key, value)
             con.commit()
         finally:
             con.close()
@@ -75,33 +160,75 @@ class StateDB:
         self.set_meta("device_id", v)
         return v
 
-    def upsert_file(self, rel_path: str, size: int, mtime: int, crc32: int, server_rev: int) -> None:
+    def upsert_file(self, rel_path: str, size: int, mtime: int, crc32: int, server_rev: int, sha256: Optional[str] = None) -> None:
         con = self.connect()
         try:
-            con.execute(
-                "INSERT INTO files(rel_path,size,mtime,crc32,server_rev) VALUES(?,?,?,?,?) "
-                "ON CONFLICT(rel_path) DO UPDATE SET "
-                "size=excluded.size, mtime=excluded.mtime, crc32=excluded.crc32, server_rev=excluded.server_rev",
-                (rel_path, int(size), int(mtime), int(crc32), int(server_rev)),
-            )
+            _upsert_file(con, rel_path, size, mtime, crc32, server_rev, sha256)
             con.commit()
         finally:
             con.close()
 
     def delete_file(self, rel_path: str) -> None:
+        self.delete_files([rel_path])
+
+    def delete_files(self, rel_paths: Iterable[str]) -> None:
         con = self.connect()
         try:
-            con.execute("DELETE FROM files WHERE rel_path=?", (rel_path,))
+            _delete_files(con, rel_paths)
             con.commit()
         finally:
             con.close()
 
+    def find_content(self, size: int, sha256: str, exclude: Optional[str] = None) -> Optional[str]:
+        con = self.connect()
+        try:
+            return _find_content(con, size, sha256, exclude)
+        finally:
+            con.close()
+
     def get_file(self, rel_path: str) -> Optional[Tuple[int, int, int, int]]:
         con = self.connect()
         try:
-            cur = con.execute("SELECT size,mtime,crc32,server_rev FROM files WHERE rel_path=?", (rel_path,))
-            row = cur.fetchone()
-            return (int(row[0]), int(row[1]), int(row[2]), int(row[3])) if row else None
+            return _get_file(con, rel_path)
+        finally:
+            con.close()
+
+    def start_replay(self, until_change_id: int) -> int:
+        # Snapshot the paths tracked now, each with the change id its row already reflects, before the
+        # cursor is reset. Paths still listed from an unfinished earlier replay keep their older mark.
+        con = self.connect()
+        try:
+            con.execute(
+                "INSERT OR IGNORE INTO replay_tracked(rel_path,until_change_id) SELECT rel_path,? FROM files",
+                (int(until_change_id),),
+            )
+            cur = con.execute("SELECT COALESCE(MAX(until_change_id),0) FROM replay_tracked")
+            replay_until = int(cur.fetchone()[0])
+            _set_meta(con, "replay_until", str(replay_until))
+            _set_meta(con, "last_change_id", "0")
+            con.commit()
+            return replay_until
+        finally:
+            con.close()
+
+    def finish_replay(self) -> None:
+        con = self.connect()
+        try:
+            con.execute("DELETE FROM replay_tracked")
+            _set_meta(con, "replay_until", "0")
+            con.commit()
+        finally:
+            con.close()
+
+    @contextmanager
+    def batch(self) -> Iterator[StateBatch]:
+        con = self.connect()
+        try:
+            yield StateBatch(con)
+            con.commit()
+        except BaseException:
+            con.rollback()
+            raise
         finally:
             con.close()
 
@@ -5,30 +5,39 @@ import shutil
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple
 
 from .api import WPDriveAPI, APIConfig, APIError
-from .state import StateDB
+from .state import StateBatch, StateDB
+from .pathfilter import PathFilter
+from .resources import SharedResources
 from .scan import scan_files
-from .util import crc32_file, ensure_dir
+from .util import crc32_file, ensure_dir, hash_file
 from .conflicts import conflict_name
 
+_PROCESS_START = time.time()
+
 @dataclass
 class LocalFileInfo:
     abs_path: Path
     size: int
     mtime: int
     crc32: int = 0
+    sha256: str = ""
 
 class SyncEngine:
-    def __init__(self, cfg: dict):
+    def __init__(self, cfg: dict, resources: Optional[SharedResources] = None, label: Optional[str] = None):
         self.cfg = cfg
+        self.resources = resources or SharedResources()
+        # Engines sharing a process (multi-root daemon) tag their log lines with the root's label.
+        self.log_prefix = f"[wpdrive:{label}]" if label else "[wpdrive]"
         self.root = Path(cfg["root"]).expanduser().resolve()
         self.ignore = cfg.get("ignore") or [".wpdrive/**"]
         self.chunk_size_mb = int(cfg.get("chunk_size_mb", 32))
         self.min_chunk_size_mb = int(cfg.get("min_chunk_size_mb", 4))
         self.timeout = int(cfg.get("timeout_seconds", 60))
         self.device_label = cfg.get("device_label") or platform.node() or "device"
+        self.path_filter = PathFilter(cfg.get("sync_include") or [], cfg.get("sync_exclude") or [])
 
         self.db = StateDB(self.root)
         self.db.initialize()
@@ -40,29 +49,81 @@ class SyncEngine:
             app_password=cfg["app_password"],
             timeout=self.timeout,
         )
-        self.api = WPDriveAPI(api_cfg)
+        self.api = WPDriveAPI(api_cfg, session=self.resources.session_for(api_cfg.url))
 
         self.tmp_dir = self.root / ".wpdrive" / "tmp"
         ensure_dir(self.tmp_dir)
 
+        # Flipped off once the server reports it has no /upload/copy, /move or /delete/batch route.
+        self.server_copy_supported = True
+        self.server_move_supported = True
+        self.server_batch_delete_supported = True
+        self.delete_batch_size = 500
+        # Cursor advances for changes that write no state (own/filtered/superseded) are committed together, up to this many.
+        self.apply_batch_size = 100
+        # Highest change id already applied before a rule-broadening replay (0 when not replaying).
+        self.replay_until = 0
+
+        self.recover()
+        self.apply_filter_rules()
+
+    def log(self, msg: str) -> None:
+        print(f"{self.log_prefix} {msg}")
+
+    def apply_filter_rules(self) -> None:
+        # Narrowed rules only drop the now out-of-scope state rows. Broadened rules also replay the
+        # feed from the start, since changes skipped under the old rules are never seen again from
+        # the current cursor; paths tracked at that point skip replayed changes up to the old cursor.
+        sig = self.path_filter.signature()
+        old = self.db.get_meta("sync_filter") or ""
+        if sig == old:
+            return
+        out_of_scope = [rel for rel, *_ in self.db.iter_files() if not self.path_filter.allows(rel)]
+        self.db.delete_files(out_of_scope)
+        last = self.db.get_last_change_id()
+        if last and not self.path_filter.within(PathFilter.from_signature(old)):
+            self.log("selective sync rules broadened; re-reading change feed")
+            self.db.start_replay(last)
+        self.db.set_meta("sync_filter", sig)
+
+    def recover(self) -> None:
+        # Downloads are staged in tmp_dir and only land in the tree via an atomic replace, so any
+        # .download.part left behind belongs to an interrupted apply. The change cursor is committed
+        # together with each applied change, so the pull resumes at the first unapplied change.
+        # Another process (a daemon plus a manual `wpdrive sync`) may be downloading into the same
+        # tmp_dir, so only part files that predate this process and have been idle well past the
+        # request timeout are treated as orphans.
+        idle_before = time.time() - max(600, 4 * self.timeout)
+        stale = []
+        for p in self.tmp_dir.glob("*.download.part"):
+            try:
+                mtime = p.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if mtime < _PROCESS_START and mtime < idle_before:
+                p.unlink(missing_ok=True)
+                stale.append(p)
+        if stale:
+            self.log(f"recovery: removed {len(stale)} orphaned partial download(s)")
+
     def run_daemon(self, interval: int = 10) -> None:
         interval = max(3, int(interval))
-        print(f"[wpdrive] daemon mode: interval={interval}s root={self.root}")
+        self.log(f"daemon mode: interval={interval}s root={self.root}")
         while True:
             try:
                 self.sync_once()
             except Exception as e:
-                print(f"[wpdrive] ERROR: {e}")
+                self.log(f"ERROR: {e}")
             time.sleep(interval)
 
     def sync_once(self) -> None:
         if not self.root.exists():
             raise RuntimeError(f"Root does not exist: {self.root}")
 
-        print(f"[wpdrive] sync: root={self.root}")
+        self.log(f"sync: root={self.root}")
         self.pull_changes()
         self.push_local_changes()
-        print("[wpdrive] sync complete")
+        self.log("sync complete")
 
     # ----------------------------
     # Pull phase
@@ -70,74 +131,149 @@ class SyncEngine:
     def pull_changes(self) -> None:
         since = self.db.get_last_change_id()
         next_since = since
-        print(f"[wpdrive] pulling changes since {since}")
+        self.replay_until = int(self.db.get_meta("replay_until") or 0)
+        self.log(f"pulling changes since {since}")
 
         while True:
-            payload = self.api.changes(since=next_since, limit=500)
+            payload = self.api.changes(since=next_since, limit=500, prefixes=self.path_filter.include)
             changes = payload.get("changes", [])
             if not changes:
                 break
 
-            for ch in changes:
-                cid = int(ch["change_id"])
-                if cid > next_since:
-                    next_since = cid
+            # Last change per path in this page; earlier changes to the same path are superseded.
+            latest = {ch.get("rel_path"): int(ch["change_id"]) for ch in changes}
+
+            # State rows are only written once a change's file work is done, and the cursor is
+            # written right before each commit, so no write lock is held across downloads or hashing.
+            with self.db.batch() as batch:
+                uncommitted = 0
+                for ch in changes:
+                    cid = int(ch["change_id"])
+                    try:
+                        self.apply_change(ch, batch, superseded=latest.get(ch.get("rel_path"), cid) > cid)
+                    except Exception:
+                        # Keep the progress of every change applied before this one.
+                        batch.set_last_change_id(next_since)
+                        batch.commit()
+                        raise
+
+                    if cid > next_since:
+                        next_since = cid
+                    uncommitted += 1
+                    if batch.pending or uncommitted >= self.apply_batch_size:
+                        batch.set_last_change_id(next_since)
+                        batch.commit()
+                        uncommitted = 0
+                batch.set_last_change_id(next_since)
+
+        if self.replay_until and next_since >= self.replay_until:
+            self.db.finish_replay()
+            self.replay_until = 0
 
-                # Skip our own changes to reduce churn
-                if ch.get("device_id") and ch["device_id"] == self.device_id:
-                    continue
+        if next_since != since:
+            self.log(f"pulled up to change_id {next_since}")
 
-                action = ch.get("action")
-                rel_path = ch.get("rel_path")
-                if not rel_path:
-                    continue
+    def apply_change(self, ch: dict, batch: StateBatch, superseded: bool = False) -> None:
+        # Skip our own changes to reduce churn
+        if ch.get("device_id") and ch["device_id"] == self.device_id:
+            return
 
-                if action == "upsert":
-                    self.apply_remote_upsert(ch)
-                elif action == "delete":
-                    self.apply_remote_delete(ch)
+        action = ch.get("action")
+        rel_path = ch.get("rel_path")
+        if not rel_path or not self.path_filter.allows(rel_path):
+            return
 
-            self.db.set_last_change_id(next_since)
+        # A later change to the same path follows in this page and decides the final state.
+        if superseded:
+            return
 
-        if next_since != since:
-            print(f"[wpdrive] pulled up to change_id {next_since}")
+        # Replay after broadened rules: a path tracked when the replay started already reflects every
+        # change up to the cursor it had then. Rows created during the replay are not in that snapshot.
+        cid = int(ch["change_id"])
+        if cid <= self.replay_until and cid <= batch.replayed_until(rel_path):
+            return
 
-    def apply_remote_upsert(self, ch: dict) -> None:
+        if action == "upsert":
+            self.apply_remote_upsert(ch, batch)
+        elif action == "delete":
+            self.apply_remote_delete(ch, batch)
+
+    def apply_remote_upsert(self, ch: dict, batch: StateBatch) -> None:
         rel = ch["rel_path"]
         rev = int(ch.get("rev") or 0)
         size = int(ch.get("size") or 0)
         mtime = int(ch.get("mtime") or 0)
+        crc32_known = ch.get("crc32") is not None
         crc32_remote = int(ch.get("crc32") or 0)
+        sha256_remote = ch.get("sha256") or None
 
         abs_path = self.root / rel
         ensure_dir(abs_path.parent)
 
-        # If local has unpushed modification, preserve as conflict copy before overwriting.
-        state = self.db.get_file(rel)
-        if abs_path.exists() and state is not None:
-            st_size, st_mtime, st_crc32, st_rev = state
+        state = batch.get_file(rel)
+        if state is not None and 0 < rev <= state[3] and abs_path.exists():
+            # Replayed change (cursor reset or resumed page) for a revision we already hold unmodified.
+            cur_stat = abs_path.stat()
+            if int(cur_stat.st_size) == state[0] and int(cur_stat.st_mtime) == state[1]:
+                return
+
+        if abs_path.exists():
             cur_stat = abs_path.stat()
             cur_size = int(cur_stat.st_size)
             cur_mtime = int(cur_stat.st_mtime)
-            if cur_size != st_size or cur_mtime != st_mtime:
-                cur_crc = crc32_file(abs_path)
-                if cur_crc != st_crc32:
-                    conflict_rel = conflict_name(rel, self.device_label)
-                    conflict_abs = self.root / conflict_rel
-                    ensure_dir(conflict_abs.parent)
-                    print(f"[wpdrive] local modified vs state; stashing conflict: {conflict_rel}")
-                    shutil.move(str(abs_path), str(conflict_abs))
-
-        tmp_path = self.tmp_dir / (abs_path.name + ".download.part")
+            cur_crc = None
+
+            # Local copy already has the remote content (restored backup, rsync from
+            # another box): adopt it into state instead of downloading it again.
+            # Empty files match without a CRC (CRC32 of no bytes is 0).
+            if cur_size == size and (crc32_known or size == 0):
+                cur_crc, cur_sha = hash_file(abs_path)
+                if size == 0 or cur_crc == crc32_remote:
+                    self.log(f"adopting existing local copy: {rel} (rev {rev})")
+                    batch.upsert_file(rel, size=cur_size, mtime=cur_mtime, crc32=cur_crc, server_rev=rev, sha256=cur_sha)
+                    return
+
+            # If local has unpushed modification (or was never synced and differs), preserve as conflict copy before overwriting.
+            if state is None:
+                # Without a remote CRC there is no evidence the copies differ.
+                modified = crc32_known
+            else:
+                st_size, st_mtime, st_crc32, st_rev = state
+                modified = False
+                if cur_size != st_size or cur_mtime != st_mtime:
+                    if cur_crc is None:
+                        cur_crc = crc32_file(abs_path)
+                    modified = cur_crc != st_crc32
+            if modified:
+                conflict_rel = conflict_name(rel, self.device_label)
+                conflict_abs = self.root / conflict_rel
+                ensure_dir(conflict_abs.parent)
+                reason = "local modified vs state" if state is not None else "unsynced local copy differs"
+                self.log(f"{reason}; stashing conflict: {conflict_rel}")
+                shutil.move(str(abs_path), str(conflict_abs))
+
+        # Per-process name so concurrent engines on one root never share a part file.
+        tmp_path = self.tmp_dir / f"{abs_path.name}.{os.getpid()}.download.part"
         if tmp_path.exists():
             tmp_path.unlink()
 
-        print(f"[wpdrive] downloading {rel} (rev {rev})")
-        with open(tmp_path, "wb") as f:
-            for chunk in self.api.download_stream(rel):
-                f.write(chunk)
+        got_crc = None
+        source = batch.find_content(size, sha256_remote, exclude=rel) if sha256_remote else None
+        if source is not None and (self.root / source).exists():
+            # Same content already synced under another path: copy it locally instead of downloading.
+            self.log(f"copying {rel} from local {source} (rev {rev})")
+            shutil.copyfile(str(self.root / source), str(tmp_path))
+            got_crc, got_sha = hash_file(tmp_path)
+            if got_sha != sha256_remote:
+                got_crc = None
+
+        if got_crc is None:
+            self.log(f"downloading {rel} (rev {rev})")
+            with self.resources.transfer_slots, open(tmp_path, "wb") as f:
+                for chunk in self.api.download_stream(rel):
+                    f.write(chunk)
+            got_crc, got_sha = hash_file(tmp_path)
 
-        got_crc = crc32_file(tmp_path)
         if crc32_remote and got_crc != crc32_remote:
             tmp_path.unlink(missing_ok=True)
             raise RuntimeError(f"CRC mismatch downloading {rel}: expected {crc32_remote} got {got_crc}")
@@ -151,9 +287,10 @@ class SyncEngine:
         except Exception:
             pass
 
-        self.db.upsert_file(rel, size=size, mtime=mtime, crc32=got_crc, server_rev=rev)
+        batch.upsert_file(rel, size=size, mtime=mtime, crc32=got_crc, server_rev=rev, sha256=got_sha)
+        return
 
-    def apply_remote_delete(self, ch: dict) -> None:
+    def apply_remote_delete(self, ch: dict, batch: StateBatch) -> None:
         rel = ch["rel_path"]
         deleted_size = ch.get("deleted_size")
         deleted_crc32 = ch.get("deleted_crc32")
@@ -162,29 +299,41 @@ class SyncEngine:
 
         abs_path = self.root / rel
         if not abs_path.exists():
-            self.db.delete_file(rel)
+            batch.delete_file(rel)
             return
 
+        state = batch.get_file(rel)
+        st = abs_path.stat()
+        local_size = int(st.st_size)
         local_crc = crc32_file(abs_path)
-        local_size = abs_path.stat().st_size
-
-        if deleted_crc32 is not None and deleted_size is not None and local_crc == deleted_crc32 and local_size == deleted_size:
-            print(f"[wpdrive] deleting (matched tombstone): {rel}")
+        matched = deleted_crc32 is not None and deleted_size is not None and local_crc == deleted_crc32 and local_size == deleted_size
+        # The tombstone may describe a newer revision this device never received (e.g. an edit
+        # skipped as superseded in the same page); a copy unchanged since our last sync is still safe to delete.
+        unchanged = state is not None and local_size == state[0] and (int(st.st_mtime) == state[1] or local_crc == state[2])
+
+        if matched or unchanged:
+            reason = "matched tombstone" if matched else "unchanged since last sync"
+            self.log(f"deleting ({reason}): {rel}")
             abs_path.unlink()
+        elif state is None:
+            # Never synced here (e.g. a pre-populated root on first sync): the tombstone is not about
+            # this copy, so leave it alone; a later upsert adopts it or the push uploads it.
+            return
         else:
             conflict_rel = conflict_name(rel, self.device_label)
             conflict_abs = self.root / conflict_rel
             ensure_dir(conflict_abs.parent)
-            print(f"[wpdrive] delete mismatch; preserving as conflict: {conflict_rel}")
+            self.log(f"delete mismatch; preserving as conflict: {conflict_rel}")
             shutil.move(str(abs_path), str(conflict_abs))
 
-        self.db.delete_file(rel)
+        batch.delete_file(rel)
+        return
 
     # ----------------------------
     # Push phase
     # ----------------------------
     def push_local_changes(self) -> None:
-        files = scan_files(self.root, self.ignore)
+        files = scan_files(self.root, self.ignore, self.path_filter)
 
         current: Dict[str, LocalFileInfo] = {}
         for rel, absp in files.items():
@@ -196,41 +345,87 @@ class SyncEngine:
                 crc32=0,
             )
 
+        known = {rel: (size, mtime, crc, rev) for rel, size, mtime, crc, rev in self.db.iter_files()}
+
         to_upload: List[str] = []
+        touched: List[str] = []
         for rel, info in current.items():
-            state = self.db.get_file(rel)
+            state = known.get(rel)
             if state is None:
                 to_upload.append(rel)
-                continue
-            st_size, st_mtime, st_crc, st_rev = state
-            if info.size != st_size or info.mtime != st_mtime:
-                info.crc32 = crc32_file(info.abs_path)
-                if info.crc32 != st_crc:
-                    to_upload.append(rel)
+            elif info.size != state[0] or info.mtime != state[1]:
+                touched.append(rel)
+
+        # Only files whose size/mtime moved need hashing; spread them over the shared hash pool.
+        hashes = self.resources.hash_files(current[rel].abs_path for rel in touched)
+        for rel, (crc, sha) in zip(touched, hashes):
+            info = current[rel]
+            info.crc32, info.sha256 = crc, sha
+            if crc != known[rel][2]:
+                to_upload.append(rel)
 
-        to_delete: List[str] = []
-        for rel, *_ in self.db.iter_files():
-            if rel not in current:
-                to_delete.append(rel)
+        to_delete: Dict[str, Tuple[int, int, int]] = {}
+        for rel, (size, _mtime, crc, rev) in known.items():
+            if rel not in current and self.path_filter.allows(rel):
+                to_delete[rel] = (size, crc, rev)
 
         if not to_upload and not to_delete:
-            print("[wpdrive] no local changes to push")
+            self.log("no local changes to push")
             return
 
+        moves = self.detect_moves(to_upload, to_delete, current, known)
+        for old_rel, new_rel in moves:
+            if self.push_one_move(old_rel, new_rel, current[new_rel], to_delete[old_rel][2]):
+                to_upload.remove(new_rel)
+                del to_delete[old_rel]
+
         for rel in sorted(to_upload):
             self.push_one_file(rel, current[rel])
 
-        for rel in sorted(to_delete):
-            self.push_one_delete(rel)
+        self.push_deletes(sorted(to_delete))
+
+    def detect_moves(self, to_upload: List[str], to_delete: Dict[str, Tuple[int, int, int]], current: Dict[str, LocalFileInfo], known: Dict[str, Tuple[int, int, int, int]]) -> List[Tuple[str, str]]:
+        # A new path whose size and CRC32 equal those of a vanished path is treated as a rename/move.
+        if not to_delete or not self.server_move_supported:
+            return []
+
+        gone: Dict[Tuple[int, int], List[str]] = {}
+        for rel, (size, crc, _rev) in sorted(to_delete.items()):
+            gone.setdefault((size, crc), []).append(rel)
+        sizes = {size for size, _crc in gone}
+
+        moves: List[Tuple[str, str]] = []
+        for rel in sorted(to_upload):
+            info = current[rel]
+            if info.size not in sizes or rel in known:
+                continue
+            if info.crc32 == 0 or not info.sha256:
+                info.crc32, info.sha256 = hash_file(info.abs_path)
+            candidates = gone.get((info.size, info.crc32))
+            if not candidates:
+                continue
+            # Prefer a candidate with the same file name (folder move) over any other match.
+            name = rel.rsplit("/", 1)[-1]
+            pick = next((c for c in candidates if c.rsplit("/", 1)[-1] == name), candidates[0])
+            candidates.remove(pick)
+            moves.append((pick, rel))
+        return moves
 
     def push_one_file(self, rel: str, info: LocalFileInfo) -> None:
-        if info.crc32 == 0:
-            info.crc32 = crc32_file(info.abs_path)
+        if info.crc32 == 0 or not info.sha256:
+            info.crc32, info.sha256 = hash_file(info.abs_path)
 
         state = self.db.get_file(rel)
         base_rev = state[3] if state else 0
 
-        print(f"[wpdrive] uploading {rel} (base_rev={base_rev})")
+        source = self.db.find_content(info.size, info.sha256, exclude=rel) if self.server_copy_supported else None
+        if source is not None:
+            fin = self.copy_from_existing(rel, source, info, base_rev)
+            if fin is not None:
+                self.finish_upload(rel, info, fin)
+                return
+
+        self.log(f"uploading {rel} (base_rev={base_rev})")
         init = self.api.upload_init(
             rel_path=rel,
             size=info.size,
@@ -239,6 +434,7 @@ class SyncEngine:
             base_rev=base_rev,
             device_id=self.device_id,
             device_label=self.device_label,
+            sha256=info.sha256,
         )
         upload_id = init["upload_id"]
         decided_path = init["decided_path"]
@@ -247,7 +443,7 @@ class SyncEngine:
         min_mb = self.min_chunk_size_mb
         offset = 0
 
-        with open(info.abs_path, "rb") as f:
+        with self.resources.transfer_slots, open(info.abs_path, "rb") as f:
             while offset < info.size:
                 f.seek(offset)
                 want = min(info.size - offset, chunk_mb * 1024 * 1024)
@@ -261,12 +457,40 @@ class SyncEngine:
                     if e.status_code in (413, 408, 504, 500, 502, 503):
                         new_mb = max(min_mb, max(1, chunk_mb // 2))
                         if new_mb < chunk_mb:
-                            print(f"[wpdrive] chunk failed ({e.status_code}); backing off {chunk_mb}MB -> {new_mb}MB")
+                            self.log(f"chunk failed ({e.status_code}); backing off {chunk_mb}MB -> {new_mb}MB")
                             chunk_mb = new_mb
                             continue
                     raise
 
         fin = self.api.upload_finalize(upload_id)
+        self.finish_upload(rel, info, fin)
+
+    def copy_from_existing(self, rel: str, source: str, info: LocalFileInfo, base_rev: int) -> Optional[dict]:
+        self.log(f"uploading {rel} as server-side copy of {source} (base_rev={base_rev})")
+        try:
+            return self.api.upload_copy(
+                rel_path=rel,
+                source_rel_path=source,
+                size=info.size,
+                mtime=info.mtime,
+                crc32=info.crc32,
+                sha256=info.sha256,
+                base_rev=base_rev,
+                device_id=self.device_id,
+                device_label=self.device_label,
+            )
+        except APIError as e:
+            if e.status_code not in (400, 404, 409, 410):
+                raise
+            code = e.payload.get("code") if isinstance(e.payload, dict) else None
+            if code == "rest_no_route":
+                self.log("server has no copy support; using regular uploads")
+                self.server_copy_supported = False
+            else:
+                self.log(f"server-side copy refused ({e.status_code}); uploading {rel} in full")
+            return None
+
+    def finish_upload(self, rel: str, info: LocalFileInfo, fin: dict, replaces: Optional[str] = None) -> None:
         server_rel = fin["rel_path"]
         rev = int(fin["rev"])
 
@@ -276,7 +500,7 @@ class SyncEngine:
             dst = self.root / server_rel
             ensure_dir(dst.parent)
             if src.exists():
-                print(f"[wpdrive] server conflict rename; renaming local to {server_rel}")
+                self.log(f"server conflict rename; renaming local to {server_rel}")
                 if dst.exists():
                     alt_rel = conflict_name(server_rel, self.device_label)
                     dst = self.root / alt_rel
@@ -287,10 +511,80 @@ class SyncEngine:
         st = (self.root / rel).stat()
         size = int(st.st_size)
         mtime = int(st.st_mtime)
-        crc = crc32_file(self.root / rel)
-        self.db.upsert_file(rel, size=size, mtime=mtime, crc32=crc, server_rev=rev)
+        crc, sha = hash_file(self.root / rel)
+        # A move drops the old path's row in the same transaction, so a crash can't leave neither row.
+        with self.db.batch() as batch:
+            if replaces is not None:
+                batch.delete_file(replaces)
+            batch.upsert_file(rel, size=size, mtime=mtime, crc32=crc, server_rev=rev, sha256=sha)
+
+    def push_one_move(self, old_rel: str, new_rel: str, info: LocalFileInfo, base_rev: int) -> bool:
+        if not self.server_move_supported:
+            return False
+        self.log(f"moving remote {old_rel} -> {new_rel}")
+        try:
+            fin = self.api.move(
+                from_rel_path=old_rel,
+                to_rel_path=new_rel,
+                base_rev=base_rev,
+                device_id=self.device_id,
+                device_label=self.device_label,
+            )
+        except APIError as e:
+            if e.status_code not in (400, 404, 409, 410):
+                raise
+            code = e.payload.get("code") if isinstance(e.payload, dict) else None
+            if code == "rest_no_route":
+                self.log("server has no move support; using upload + delete")
+                self.server_move_supported = False
+            else:
+                self.log(f"server-side move refused ({e.status_code}); uploading {new_rel} in full")
+            return False
+        self.finish_upload(new_rel, info, fin, replaces=old_rel)
+        return True
+
+    def push_deletes(self, rels: List[str]) -> None:
+        if not rels:
+            return
+        if not self.server_batch_delete_supported or len(rels) == 1:
+            for rel in rels:
+                self.push_one_delete(rel)
+            return
+
+        for i in range(0, len(rels), self.delete_batch_size):
+            batch = rels[i:i + self.delete_batch_size]
+            self.log(f"deleting {len(batch)} remote files")
+            try:
+                res = self.api.delete_batch(rel_paths=batch, device_id=self.device_id)
+            except APIError as e:
+                code = e.payload.get("code") if isinstance(e.payload, dict) else None
+                if e.status_code != 404 or code != "rest_no_route":
+                    raise
+                self.log("server has no batch delete support; deleting one by one")
+                self.server_batch_delete_supported = False
+                for rel in rels[i:]:
+                    self.push_one_delete(rel)
+                return
+            failed = self.batch_delete_failures(res, batch)
+            for rel in sorted(failed):
+                self.log(f"remote delete failed; keeping in state: {rel}")
+            self.db.delete_files(rel for rel in batch if rel not in failed)
+
+    def batch_delete_failures(self, res: dict, batch: List[str]) -> Set[str]:
+        # /delete/batch reports per-path outcome as "failed" (paths or {"rel_path": ...} items)
+        # and/or "deleted"; paths it did not confirm stay in state and are retried next sync.
+        if not isinstance(res, dict):
+            return set()
+        failed = {
+            (item.get("rel_path") if isinstance(item, dict) else item)
+            for item in res.get("failed") or []
+        }
+        if isinstance(res.get("deleted"), list):
+            deleted = {(item.get("rel_path") if isinstance(item, dict) else item) for item in res["deleted"]}
+            failed |= {rel for rel in batch if rel not in deleted}
+        return failed & set(batch)
 
     def push_one_delete(self, rel: str) -> None:
-        print(f"[wpdrive] deleting remote {rel}")
+        self.log(f"deleting remote {rel}")
         self.api.delete(rel_path=rel, device_id=self.device_id)
         self.db.delete_file(rel)
@@ -1,9 +1,10 @@
 from __future__ import annotations
+import hashlib
 import json
 import time
 import zlib
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 def ensure_dir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
@@ -18,6 +19,8 @@ def default_config() -> Dict[str, Any]:
         "min_chunk_size_mb": 4,
         "timeout_seconds": 60,
         "ignore": [".wpdrive/**"],
+        "sync_include": [],
+        "sync_exclude": [],
         "device_label": None,
     }
 
@@ -47,5 +50,17 @@ def crc32_file(path: Path, chunk_size: int = 4 * 1024 * 1024) -> int:
             crc = zlib.crc32(data, crc)
     return crc & 0xFFFFFFFF
 
+def hash_file(path: Path, chunk_size: int = 4 * 1024 * 1024) -> Tuple[int, str]:
+    crc = 0
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            crc = zlib.crc32(data, crc)
+            h.update(data)
+    return crc & 0xFFFFFFFF, h.hexdigest()
+
 def now_utc_ts() -> int:
     return int(time.time())